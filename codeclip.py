@@ -5,177 +5,696 @@ for sharing with LLMs.
 
 Usage:
     codeclip.py PATH [--extensions EXT1,EXT2,...] [--exclude DIR1,DIR2,...] 
-                    [--max-size SIZE_KB] [--max-depth DEPTH]
+                    [--max-size SIZE_KB] [--max-depth DEPTH] [--cache]
 
 Examples:
     codeclip.py ~/projects/myapp --extensions py,js,html --exclude node_modules,venv --max-size 100
+    codeclip.py ~/projects/myapp --exclude 'node_modules,*.egg-info,.*'
 """
 
+# subprocess and concurrent.futures are imported where they are used, so --help and
+# argument errors exit without loading them; sqlite3 and re are only needed with
+# --cache and --exclude patterns
+import io
 import os
 import sys
-import glob
-import argparse
-import subprocess
-from datetime import datetime
+import mmap
+import time
+import types
+import codecs
+import itertools
+import collections
+
+# Read size used when streaming file contents into the output buffer
+CHUNK_SIZE = 64 * 1024
+
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB')
+
+# Fixed parts of each file's header and footer, encoded once
+HEADER_FILE = b'## File: '
+HEADER_SIZE = b'\n## Size: '
+HEADER_MODIFIED = b' | Last Modified: '
+HEADER_END = b'\n```\n'
+FOOTER = b'\n```\n\n'  # Closing fence plus an empty line for separation
+
+# Last-modified timestamp, filled from the first six fields of time.localtime()
+MTIME_FORMAT = b'%04d-%02d-%02d %02d:%02d:%02d'
+
+# Where --cache keeps file contents between runs
+CACHE_PATH = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+                          'codeclip', 'contents.sqlite3')
+
+# Cached files of a root not copied for this long are dropped from the cache
+CACHE_MAX_AGE = 30 * 24 * 60 * 60
+
+# Newly read contents are written to the cache whenever this much has built up, so a
+# cold run doesn't hold a second copy of every file until the end
+CACHE_FLUSH_BYTES = 8 * 1024 * 1024
+
+# Leading bytes inspected to decide whether a file is binary
+SNIFF_SIZE = 8 * 1024
+
+# Bytes expected in text: printable ASCII plus \a \b \t \n \f \r and ESC (the same set file(1) uses)
+TEXT_BYTES = bytes({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x7f)))
+
+# Files at least this large are memory-mapped instead of read into a bytes object
+MMAP_THRESHOLD = 64 * 1024
+
+# Threads listing directories; listings mostly wait on the disk, and readdir and
+# stat release the GIL, so many can be in flight even on a single core
+SCAN_WORKERS = 16
+
+# Threads reading file contents; reads release the GIL, so this can exceed the core count
+READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Reads in flight ahead of the writer; each finished mmap holds a file descriptor until
+# it is written out, so this bounds open descriptors however many large files there are
+READ_WINDOW = 2 * READ_WORKERS
+
+# Whether files can be stat'd relative to an open directory descriptor
+DIR_FD_SUPPORTED = hasattr(os, 'O_DIRECTORY') and os.stat in os.supports_dir_fd
 
 
 def format_size(size_bytes):
     """Format file size in a human-readable format."""
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size_bytes < 1024 or unit == 'GB':
-            return f"{size_bytes:.2f} {unit}"
-        size_bytes /= 1024
+    # Each unit is 2**10 times the previous one, so the bit length picks the unit directly
+    unit = min(len(SIZE_UNITS) - 1, max(0, int(size_bytes).bit_length() - 1) // 10)
+    return f"{size_bytes / (1 << (10 * unit)):.2f} {SIZE_UNITS[unit]}"
 
 
-def should_include_file(file_path, extensions=None):
-    """Check if file should be included based on extensions."""
-    if extensions is None:
-        return True
-    return any(file_path.endswith('.' + ext) for ext in extensions)
+def _extension_suffixes(extensions):
+    """Build the tuple of dotted suffixes for str.endswith, or None to include every file."""
+    if isinstance(extensions, str):
+        extensions = extensions.split(',')
+    return tuple('.' + ext for ext in extensions) if extensions else None
+
+
+def _exclude_matcher(exclude_dirs):
+    """Build a predicate telling whether a directory name is excluded.
+
+    Plain names are looked up in a frozenset; names containing glob wildcards
+    (e.g. "*.egg-info") are compiled together into a single regex.
+    """
+    exclude_dirs = exclude_dirs or ()
+    names = frozenset(d for d in exclude_dirs if not any(c in d for c in '*?['))
+    patterns = [d for d in exclude_dirs if d not in names]
+    if not patterns:
+        return names.__contains__
+
+    import re
+    import fnmatch
+    match = re.compile('|'.join(fnmatch.translate(d) for d in patterns)).match
+    return lambda name: name in names or match(name) is not None
+
+
+# A file to include in the output, with the stat taken during the scan (or the error it raised)
+FileRecord = collections.namedtuple('FileRecord', 'path relative_path stat error')
+
+
+def _open_dir_fd(path):
+    """Open a directory descriptor for fd-relative stat calls, or return None if unavailable."""
+    if not DIR_FD_SUPPORTED:
+        return None
+    try:
+        return os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return None
+
+
+def _record_files(path, relative_dir, files, records):
+    """Append a FileRecord for each matching file of one directory, stat'd relative to it."""
+    # Per-file stats resolve names relative to this directory instead of walking the full path
+    dir_fd = _open_dir_fd(path)
+    try:
+        for entry in files:
+            try:
+                file_stat = os.stat(entry.name if dir_fd is not None else entry.path, dir_fd=dir_fd)
+                error = None
+            except OSError as e:
+                file_stat, error = None, e
+            records.append(FileRecord(entry.path, os.path.join(relative_dir, entry.name), file_stat, error))
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
+
+
+def _list_entries(path, relative_dir, suffixes, is_excluded, record):
+    """Read one directory, classifying each entry once.
+
+    Returns (files, dirs, records): the names of files matching the extension filter,
+    the (name, path) of each non-excluded subdirectory, both sorted by name, and a
+    FileRecord per matching file when record is true. Only these plain values outlive
+    the call, not the DirEntry objects. Raises OSError if the directory can't be read.
+    """
+    files = []
+    dirs = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                # Prune excluded directories before descending
+                if not is_excluded(entry.name):
+                    dirs.append((entry.name, entry.path))
+            elif entry.is_file() and (suffixes is None or entry.name.endswith(suffixes)):
+                files.append((entry.name, entry))
+
+    # Only the kept entries are sorted, not everything the filter drops
+    files.sort()
+    dirs.sort()
+    records = []
+    if record and files:
+        _record_files(path, relative_dir, [entry for _, entry in files], records)
+    return [name for name, _ in files], dirs, records
+
 
+def _list_batch(batch, suffixes, is_excluded, record):
+    """List several directories in one task, pairing each (path, relative_dir) with its listing or OSError."""
+    results = []
+    for dir_path, relative_dir in batch:
+        try:
+            listing = _list_entries(dir_path, relative_dir, suffixes, is_excluded, record)
+        except OSError as e:
+            listing = e
+        results.append((dir_path, relative_dir, listing))
+    return results
 
-def get_filtered_directory_structure(path, extensions=None, exclude_dirs=None, max_depth=None, current_depth=0):
-    """Generate a string representation of directory structure, filtered by extensions."""
+
+def _has_match(path, suffixes, is_excluded):
+    """Check whether a directory holds a matching file anywhere below it, stopping at the first."""
+    try:
+        files, dirs, _ = _list_entries(path, '', suffixes, is_excluded, False)
+    except OSError:
+        return False
+    return bool(files) or any(_has_match(dir_path, suffixes, is_excluded) for _, dir_path in dirs)
+
+
+def _render_tree(path, listings, matches, suffixes, records):
+    """Render a scanned directory from listings, returning (rendered_lines, has_match).
+
+    Subdirectories that were not listed lie past max_depth; whether they hold a match
+    comes from matches, and they are never rendered.
+    """
+    listing = listings[path]
+    if isinstance(listing, PermissionError):
+        return ["(Permission denied)"], False
+    if isinstance(listing, OSError):
+        return [], False
+
+    files, dirs, file_records = listing
+    if records is not None:
+        records.extend(file_records)
+
+    # Rendered block per entry name, so files and directories can be merged in sorted order
+    blocks = {name: (name,) for name in files}
+    has_match = bool(files)
+    for name, dir_path in dirs:
+        if dir_path in listings:
+            sub_lines, sub_match = _render_tree(dir_path, listings, matches, suffixes, records)
+        else:
+            # Without a filter every directory is listed, so nothing was searched
+            sub_lines = ()
+            sub_match = matches[dir_path].result() if suffixes is not None else True
+        if sub_match or suffixes is None:
+            has_match = has_match or sub_match
+            blocks[name] = [f"{name}/"] + ["  " + line for line in sub_lines]
+
+    lines = []
+    for name in sorted(blocks):
+        lines.extend(blocks[name])
+    return lines, has_match
+
+
+def _scan_tree(path, suffixes, is_excluded, max_depth, current_depth, records=None):
+    """Walk a directory tree once, returning (rendered_lines, has_match).
+
+    Directories are read a level at a time on a thread pool, so many readdir and stat
+    calls are in flight at once, then the structure is rendered from the listings.
+    Subdirectories past max_depth are only searched for a first match, so the parent
+    knows whether to list them. If records is a list, a FileRecord is appended for
+    every file process_files should include, in output order: a directory's own
+    files, then each subdirectory's.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    listings = {}
+    matches = {}
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+        level = [(path, '')]
+        depth = current_depth
+        while level:
+            # Files are recorded only in directories whose children are rendered too
+            expand = max_depth is None or depth < max_depth
+            record = records is not None and expand
+
+            # One task per worker rather than per directory keeps scheduling overhead per level
+            tasks = min(SCAN_WORKERS, len(level))
+            futures = [
+                executor.submit(_list_batch, level[i::tasks], suffixes, is_excluded, record)
+                for i in range(tasks)
+            ]
+            next_level = []
+            for dir_path, relative_dir, listing in itertools.chain.from_iterable(f.result() for f in futures):
+                listings[dir_path] = listing
+                if isinstance(listing, OSError):
+                    continue
+                for name, sub_path in listing[1]:
+                    if expand:
+                        next_level.append((sub_path, os.path.join(relative_dir, name)))
+                    elif suffixes is not None:
+                        matches[sub_path] = executor.submit(_has_match, sub_path, suffixes, is_excluded)
+            level = next_level
+            depth += 1
+
+        # A root that can't be listed at all, e.g. a regular file, is the caller's error
+        root_listing = listings[path]
+        if isinstance(root_listing, OSError) and not isinstance(root_listing, PermissionError):
+            raise root_listing
+        return _render_tree(path, listings, matches, suffixes, records)
+
+
+def get_filtered_directory_structure(path, extensions=None, exclude_dirs=None, max_depth=None, current_depth=0,
+                                     records=None):
+    """Generate a string representation of directory structure, filtered by extensions.
+
+    If records is a list, the same scan also fills it with a FileRecord for every
+    file within max_depth, in the order process_files writes them.
+    """
     if max_depth is not None and current_depth > max_depth:
         return "..."
-    
-    structure = []
+
+    suffixes = _extension_suffixes(extensions)
+    is_excluded = _exclude_matcher(exclude_dirs)
+    lines, _ = _scan_tree(path, suffixes, is_excluded, max_depth, current_depth, records=records)
+    return "\n".join(lines)
+
+
+def _is_utf8(data):
+    """Check that a bytes-like object is valid UTF-8, decoding it in small slices."""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    with memoryview(data) as view:
+        try:
+            for start in range(0, len(view), CHUNK_SIZE):
+                decoder.decode(view[start:start + CHUNK_SIZE])
+            decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            return False
+    return True
+
+
+def _is_probably_binary(head):
+    """Guess whether a file is binary from its first bytes.
+
+    A NUL byte means binary and valid UTF-8 means text; anything else is binary
+    when over 30% of it is control characters or non-ASCII bytes.
+    """
+    if not head:
+        return False
+    if b'\x00' in head:
+        return True
     try:
-        items = sorted(os.listdir(path))
-        for item in items:
-            item_path = os.path.join(path, item)
-            
-            # Skip excluded directories
-            if os.path.isdir(item_path) and exclude_dirs and item in exclude_dirs:
-                continue
-                
-            if os.path.isdir(item_path):
-                # Check if directory contains any matching files before including it
-                has_matching_files = False
-                
-                for root, _, files in os.walk(item_path):
-                    if any(should_include_file(os.path.join(root, f), extensions) for f in files):
-                        has_matching_files = True
-                        break
-                    
-                    # Respect exclude_dirs for subdirectories
-                    if exclude_dirs:
-                        for exclude_dir in exclude_dirs:
-                            if exclude_dir in os.path.basename(root):
-                                # Skip this directory
-                                continue
-                
-                if has_matching_files or extensions is None:
-                    structure.append(f"{item}/")
-                    if max_depth is None or current_depth < max_depth:
-                        sub_structure = get_filtered_directory_structure(
-                            item_path, extensions, exclude_dirs, max_depth, current_depth + 1
-                        )
-                        if sub_structure:
-                            structure.append("  " + "\n  ".join(sub_structure.split("\n")))
-            elif should_include_file(item_path, extensions):
-                structure.append(item)
-    except PermissionError:
-        structure.append("(Permission denied)")
-    
-    return "\n".join(structure)
-
-
-def process_files(directory, extensions=None, exclude_dirs=None, max_size=None, max_depth=None):
-    """Process all files in the directory and return formatted content."""
+        # Incremental, so a multi-byte sequence cut off at the end of the sample is allowed
+        codecs.getincrementaldecoder('utf-8')().decode(head)
+        return False
+    except UnicodeDecodeError:
+        pass
+    return len(head.translate(None, TEXT_BYTES)) / len(head) > 0.30
+
+
+def _read_file(path, size=0):
+    """Read a file as UTF-8 bytes, replacing invalid sequences as text-mode reading would.
+
+    Returns None without reading further if the first SNIFF_SIZE bytes look binary.
+    Files of at least MMAP_THRESHOLD bytes are memory-mapped rather than read, so their
+    contents are copied once, from the page cache into the output. The caller closes
+    the returned mmap after writing it out.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(SNIFF_SIZE)
+        if _is_probably_binary(head):
+            return None
+        data = None
+        if size >= MMAP_THRESHOLD:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                pass  # The file was emptied since it was stat'd
+            except OSError:
+                pass  # No descriptors or mappings to spare; a plain read still works
+        if data is None:
+            rest = f.read()
+            data = head + rest if rest else head
+    if _is_utf8(data):
+        return data
+    text = str(data, 'utf-8', 'replace')
+    if isinstance(data, mmap.mmap):
+        data.close()
+    return text.encode('utf-8')
+
+
+def _open_cache(path):
+    """Open the persistent content cache, or return None if it cannot be used.
+
+    Contents are SQLite blobs keyed by (root, relative path), so there is no limit on
+    value size like dbm.ndbm has on macOS. The cache copies whatever files are read,
+    secrets included, so only the owner can read it.
+    """
+    import sqlite3
+    try:
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        cache = sqlite3.connect(path)
+    except (OSError, sqlite3.Error):
+        return None
+    try:
+        cache.execute(
+            "CREATE TABLE IF NOT EXISTS files (root TEXT, path TEXT, mtime_ns INTEGER, size INTEGER,"
+            " content BLOB, used REAL, PRIMARY KEY (root, path))"
+        )
+        os.chmod(path, 0o600)
+    except (OSError, sqlite3.Error):
+        cache.close()
+        return None
+    return cache
+
+
+def _store_cache(cache, root, entries):
+    """Store (path, mtime_ns, size, content) entries for root in one transaction.
+
+    Failures are ignored, since the cache only saves work.
+    """
+    import sqlite3
+    now = time.time()
+    try:
+        with cache:
+            cache.executemany(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                [(root, path, mtime_ns, size, content, now) for path, mtime_ns, size, content in entries]
+            )
+    except sqlite3.Error:
+        pass
+
+
+def _prune_cache(cache, root, seen):
+    """Evict stale cache entries in one transaction.
+
+    Files under root that no longer exist are dropped, as are roots not copied for
+    CACHE_MAX_AGE. Files this run merely filtered out are kept, so changing -e, -x or
+    the size and depth limits between runs doesn't empty the cache. Failures are
+    ignored, since the cache only saves work.
+    """
+    import sqlite3
+    now = time.time()
+    try:
+        with cache:
+            stale = [(root, path) for path, in cache.execute("SELECT path FROM files WHERE root = ?", (root,))
+                     if path not in seen and not os.path.exists(os.path.join(root, path))]
+            cache.executemany("DELETE FROM files WHERE root = ? AND path = ?", stale)
+            cache.execute("UPDATE files SET used = ? WHERE root = ?", (now, root))
+            cache.execute("DELETE FROM files WHERE used < ?", (now - CACHE_MAX_AGE,))
+    except sqlite3.Error:
+        pass
+
+
+def process_files(directory, extensions=None, exclude_dirs=None, max_size=None, max_depth=None,
+                  cache_path=None):
+    """Process all files in the directory and return formatted content as a list of UTF-8 byte chunks.
+
+    If cache_path is given, file contents are kept in an SQLite database there, keyed by
+    root and relative path, and reused on later runs while a file's mtime and size are
+    unchanged.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    
     if exclude_dirs is None:
         exclude_dirs = []
     
-    # Convert extensions to a list if it's a string
-    if isinstance(extensions, str):
-        extensions = extensions.split(',')
+    max_bytes = max_size * 1024 if max_size is not None else None
+    
+    # Filled by the structure scan, so the tree is only walked once
+    records = []
     
-    result = []
+    # Output is kept as UTF-8 bytes so file contents are copied without a decode/encode round trip
+    buf = io.BytesIO()
+    
+    def write(text):
+        buf.write(text.encode('utf-8'))
     
     # Add filtered directory structure
-    result.append("# Directory Structure (Filtered)\n```")
-    result.append(get_filtered_directory_structure(directory, extensions, exclude_dirs, max_depth))
-    result.append("```\n")
+    write("# Directory Structure (Filtered)\n```\n")
+    write(get_filtered_directory_structure(directory, extensions, exclude_dirs, max_depth, records=records))
+    write("\n```\n\n")
     
     # Process files
-    result.append("# Source Files\n")
+    write("# Source Files\n\n")
     
     file_count = 0
     
-    for root, dirs, files in os.walk(directory):
-        # Skip excluded directories
-        dirs[:] = [d for d in dirs if d not in exclude_dirs]
-        
-        # Check depth
-        relative_path = os.path.relpath(root, directory)
-        current_depth = 0 if relative_path == '.' else relative_path.count(os.sep) + 1
-        if max_depth is not None and current_depth >= max_depth:
-            dirs[:] = []  # Don't go deeper
-            continue
-        
-        for file in sorted(files):
-            # Filter by extension if specified
-            if extensions and not any(file.endswith('.' + ext) for ext in extensions):
-                continue
-            
-            file_path = os.path.join(root, file)
+    # Bind functions used per file to locals to skip repeated global and attribute lookups
+    _localtime = time.localtime
+    _fmt = format_size
+    _join = b''.join
+    bwrite = buf.write
+    
+    abs_directory = os.path.abspath(directory)
+    cache = _open_cache(cache_path) if cache_path else None
+    
+    # Files read for the cache and not yet stored, their total size, and every path
+    # the cache was consulted for
+    cache_entries = []
+    cache_bytes = 0
+    cache_seen = set()
+    
+    # Output entries in order: a preformatted note, or (relative_path, cache_key, stat,
+    # content), where content is to_read until the file's read is taken from reads
+    to_read = object()
+    pending = collections.deque()
+    
+    # Files still to read, in output order, and the reads in flight for the first of them
+    queued = collections.deque()
+    reads = collections.deque()
+    
+    try:
+        with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+            submit = executor.submit
             
-            try:
-                # Get file stats
-                file_stat = os.stat(file_path)
+            for file_path, relative_path, file_stat, error in records:
+                if error is not None:
+                    pending.append(f"# ERROR reading {relative_path}: {str(error)}\n\n")
+                    continue
                 file_size = file_stat.st_size
                 
-                # Skip if file is too large
-                if max_size is not None and file_size > max_size * 1024:
-                    result.append(f"# SKIPPED (TOO LARGE): {os.path.relpath(file_path, directory)}")
-                    result.append(f"# Size: {format_size(file_size)}")
-                    result.append("")
+                # Skip if file is too large, without ever opening it
+                if max_bytes is not None and file_size > max_bytes:
+                    pending.append(f"# SKIPPED (TOO LARGE): {relative_path}\n# Size: {_fmt(file_size)}\n\n")
                     continue
                 
-                # File metadata
-                mod_time = datetime.fromtimestamp(file_stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
-                relative_path = os.path.relpath(file_path, directory)
+                # Reuse cached content if the file is unchanged since it was stored
+                cache_key = None
+                if cache is not None:
+                    cache_key = relative_path
+                    cache_seen.add(cache_key)
+                    cached = cache.execute(
+                        "SELECT mtime_ns, size, content FROM files WHERE root = ? AND path = ?",
+                        (abs_directory, cache_key)
+                    ).fetchone()
+                    if cached is not None and cached[:2] == (file_stat.st_mtime_ns, file_size):
+                        pending.append((relative_path, None, file_stat, cached[2]))
+                        continue
                 
-                result.append(f"## File: {relative_path}")
-                result.append(f"## Size: {format_size(file_size)} | Last Modified: {mod_time}")
-                result.append("```")
+                pending.append((relative_path, cache_key, file_stat, to_read))
+                queued.append((file_path, file_size))
+            
+            # Write entries in order, waiting on each read as it comes up, while keeping up to
+            # READ_WINDOW later reads running concurrently
+            while pending:
+                while queued and len(reads) < READ_WINDOW:
+                    reads.append(submit(_read_file, *queued.popleft()))
                 
-                # Read file content
-                with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-                    content = f.read()
-                    result.append(content)
+                item = pending.popleft()
+                if isinstance(item, str):
+                    write(item)
+                    continue
                 
-                result.append("```")
-                result.append("")  # Empty line for separation
-                file_count += 1
+                relative_path, cache_key, file_stat, content = item
+                if content is to_read:
+                    try:
+                        content = reads.popleft().result()
+                    except (OSError, UnicodeDecodeError) as e:
+                        # The file may have changed or gone since the scan stat'd it
+                        write(f"# ERROR reading {relative_path}: {str(e)}\n\n")
+                        continue
+                    if cache_key is not None:
+                        cache_entries.append((cache_key, file_stat.st_mtime_ns, file_stat.st_size,
+                                              bytes(content) if content is not None else None))
+                        cache_bytes += file_stat.st_size
+                        if cache_bytes >= CACHE_FLUSH_BYTES:
+                            _store_cache(cache, abs_directory, cache_entries)
+                            cache_entries = []
+                            cache_bytes = 0
                 
-            except (PermissionError, UnicodeDecodeError, IsADirectoryError) as e:
-                result.append(f"# ERROR reading {os.path.relpath(file_path, directory)}: {str(e)}")
-                result.append("")
-    
-    # Add summary
-    result.insert(0, f"# CodeClip Output - {file_count} files from {os.path.abspath(directory)}\n")
+                if content is None:
+                    write(f"# SKIPPED (BINARY): {relative_path}\n# Size: {_fmt(file_stat.st_size)}\n\n")
+                    continue
+                
+                # File metadata
+                mod_time = MTIME_FORMAT % _localtime(file_stat.st_mtime)[:6]
+                
+                # Only the variable parts of the header are encoded per file
+                bwrite(_join((
+                    HEADER_FILE, relative_path.encode('utf-8'),
+                    HEADER_SIZE, _fmt(file_stat.st_size).encode('ascii'),
+                    HEADER_MODIFIED, mod_time, HEADER_END,
+                )))
+                bwrite(content)
+                if isinstance(content, mmap.mmap):
+                    content.close()
+                bwrite(FOOTER)
+                file_count += 1
+        
+        if cache is not None:
+            _store_cache(cache, abs_directory, cache_entries)
+            _prune_cache(cache, abs_directory, cache_seen)
+    finally:
+        if cache is not None:
+            cache.close()
     
-    return "\n".join(result)
+    # Add summary. The file count is only final once every read has finished, so the
+    # summary goes out as its own leading chunk rather than being inserted ahead of
+    # the body; a view of the buffer lets the body reach the pipe without another copy
+    summary = f"# CodeClip Output - {file_count} files from {abs_directory}\n\n"
+    return [summary.encode('utf-8'), buf.getbuffer()]
+
 
+def copy_to_clipboard(chunks):
+    """Copy text to macOS clipboard, streaming it into pbcopy one chunk at a time.
 
-def copy_to_clipboard(text):
-    """Copy text to macOS clipboard."""
+    Accepts a str, UTF-8 bytes, or an iterable of str or bytes-like chunks.
+    Bytes-like chunks are written to the pipe directly, without an intermediate copy.
+    """
+    import subprocess
+    
+    if isinstance(chunks, (str, bytes)):
+        chunks = (chunks,)
     process = subprocess.Popen('pbcopy', env={'LANG': 'en_US.UTF-8'}, stdin=subprocess.PIPE)
-    process.communicate(text.encode('utf-8'))
-    return process.returncode
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            process.stdin.write(chunk)
+    finally:
+        process.stdin.close()
+    return process.wait()
+
+
+# Command line options: (long flag, short flag, destination, type, default, help)
+OPTIONS = (
+    ('--extensions', '-e', 'extensions', str, None, "Comma-separated list of file extensions to include"),
+    ('--exclude', '-x', 'exclude', str, None,
+     "Comma-separated list of directories to exclude (glob patterns allowed)"),
+    ('--max-size', '-s', 'max_size', int, 500, "Maximum file size in KB (default: 500KB)"),
+    ('--max-depth', '-d', 'max_depth', int, None, "Maximum directory depth to traverse"),
+    ('--cache', '-c', 'cache', bool, False, f"Reuse file contents cached by earlier runs (stored in {CACHE_PATH})"),
+)
+
+
+def _usage(prog):
+    """Return the one-line usage string."""
+    flags = " ".join(f"[{short}]" if kind is bool else f"[{short} {dest.upper()}]"
+                     for _, short, dest, kind, _, _ in OPTIONS)
+    return f"usage: {prog} [-h] {flags} path"
+
+
+def _print_help(prog):
+    """Print usage and option descriptions, in the layout argparse would use."""
+    print(_usage(prog))
+    print("\nCopy source code from directories to clipboard for LLMs\n")
+    print("positional arguments:")
+    print(f"  {'path':<30}Path to the directory containing source code\n")
+    print("options:")
+    print(f"  {'-h, --help':<30}show this help message and exit")
+    for long, short, dest, kind, _, help_text in OPTIONS:
+        flags = f"{short}, {long}" if kind is bool else f"{short}, {long} {dest.upper()}"
+        print(f"  {flags:<30}{help_text}")
+
+
+def parse_args(argv=None):
+    """Parse command line arguments.
+
+    A small stand-in for argparse, which costs more to import than the rest of the
+    startup. Accepts "--opt value", "--opt=value", "-o value" and "-ovalue", and any
+    unambiguous prefix of a long option, and exits with status 2 on bad input as
+    argparse does. Unlike argparse, short flags can't be bundled ("-ch").
+    """
+    prog = os.path.basename(sys.argv[0])
+    argv = sys.argv[1:] if argv is None else argv
+
+    def error(message):
+        print(_usage(prog), file=sys.stderr)
+        print(f"{prog}: error: {message}", file=sys.stderr)
+        sys.exit(2)
+
+    aliases = {}
+    for option in OPTIONS:
+        aliases[option[0]] = aliases[option[1]] = option
+    long_flags = ['--help'] + [option[0] for option in OPTIONS]
+    args = {dest: default for _, _, dest, _, default, _ in OPTIONS}
+    positional = []
+
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        i += 1
+        if arg == '--':
+            positional.extend(argv[i:])
+            break
+        if not arg.startswith('-') or arg == '-':
+            positional.append(arg)
+            continue
+
+        if arg.startswith('--'):
+            name, has_value, value = arg.partition('=')
+            if name not in long_flags:
+                candidates = [flag for flag in long_flags if flag.startswith(name)]
+                if len(candidates) > 1:
+                    error(f"ambiguous option: {name} could match {', '.join(candidates)}")
+                if candidates:
+                    name = candidates[0]
+        else:
+            # A short option's value may be attached, as in "-s100" or "-s=100"
+            name, value = arg[:2], arg[2:]
+            has_value = bool(value)
+            if value.startswith('='):
+                value = value[1:]
+        if name in ('-h', '--help'):
+            _print_help(prog)
+            sys.exit(0)
+        if name not in aliases:
+            error(f"unrecognized arguments: {arg}")
+        _, _, dest, kind, _, _ = aliases[name]
+        if kind is bool:
+            if has_value:
+                error(f"argument {name}: ignored explicit argument '{value}'")
+            args[dest] = True
+            continue
+        if not has_value:
+            if i >= len(argv):
+                error(f"argument {name}: expected one argument")
+            value = argv[i]
+            i += 1
+        if kind is int:
+            try:
+                value = int(value)
+            except ValueError:
+                error(f"argument {name}: invalid int value: '{value}'")
+        args[dest] = value
+
+    if not positional:
+        error("the following arguments are required: path")
+    if len(positional) > 1:
+        error(f"unrecognized arguments: {' '.join(positional[1:])}")
+    return types.SimpleNamespace(path=positional[0], **args)
 
 
 def main():
-    parser = argparse.ArgumentParser(description="Copy source code from directories to clipboard for LLMs")
-    parser.add_argument("path", help="Path to the directory containing source code")
-    parser.add_argument("--extensions", "-e", help="Comma-separated list of file extensions to include")
-    parser.add_argument("--exclude", "-x", help="Comma-separated list of directories to exclude")
-    parser.add_argument("--max-size", "-s", type=int, default=500, 
-                        help="Maximum file size in KB (default: 500KB)")
-    parser.add_argument("--max-depth", "-d", type=int, help="Maximum directory depth to traverse")
-    
-    args = parser.parse_args()
+    args = parse_args()
     
     # Verify the path exists
     if not os.path.exists(args.path):
@@ -199,7 +718,8 @@ def main():
             extensions=extensions,
             exclude_dirs=exclude_dirs,
             max_size=args.max_size,
-            max_depth=args.max_depth
+            max_depth=args.max_depth,
+            cache_path=CACHE_PATH if args.cache else None
         )
         
         # Copy to clipboard